@@ -5,15 +5,11 @@ Allan Dataset Manager - Умная система управления дата
 """
 
 import os
-import time
+import sys
 import shutil
 import zipfile
 import tarfile
-from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
-import psutil
-import subprocess
 
 @dataclass
 class DatasetInfo:
@@ -120,29 +116,33 @@ class AllanDatasetManager:
         """Выбор оптимальной стратегии загрузки"""
         available_space_gb = self.get_available_space_gb()
         dataset_size_gb = dataset_size_mb / 1024
-        
-        print(f"📊 Размер датасета: {dataset_size_mb:.1f} МБ ({dataset_size_gb:.2f} ГБ)")
-        print(f"💾 Доступно места: {available_space_gb:.1f} ГБ")
-        
+
+        # Собираем вывод в один буфер: один write вместо серии print
+        # (каждый print в Colab - отдельный flush в websocket)
+        lines = [
+            f"📊 Размер датасета: {dataset_size_mb:.1f} МБ ({dataset_size_gb:.2f} ГБ)",
+            f"💾 Доступно места: {available_space_gb:.1f} ГБ",
+        ]
+
         # Проверка достаточности места
         if dataset_size_gb > available_space_gb * 0.8:  # Оставляем 20% запаса
-            print("⚠️  Недостаточно места для локального копирования")
+            lines.append("⚠️  Недостаточно места для локального копирования")
+            sys.stdout.write("\n".join(lines) + "\n")
             return "streaming"
-        
+
         # Выбор стратегии по размеру
         if dataset_size_mb < self.SMALL_DATASET_THRESHOLD:
             strategy = "direct"
-            print(f"🔄 Стратегия: Прямое чтение с Drive (< {self.SMALL_DATASET_THRESHOLD} МБ)")
-        elif dataset_size_mb < self.MEDIUM_DATASET_THRESHOLD:
-            strategy = "copy_local"
-            print(f"🔄 Стратегия: Копирование в локальный кэш (< {self.MEDIUM_DATASET_THRESHOLD} МБ)")
+            lines.append(f"🔄 Стратегия: Прямое чтение с Drive (< {self.SMALL_DATASET_THRESHOLD} МБ)")
         elif dataset_size_mb < self.LARGE_DATASET_THRESHOLD:
             strategy = "copy_local"
-            print(f"🔄 Стратегия: Копирование в локальный кэш (< {self.LARGE_DATASET_THRESHOLD} МБ)")
+            limit = self.MEDIUM_DATASET_THRESHOLD if dataset_size_mb < self.MEDIUM_DATASET_THRESHOLD else self.LARGE_DATASET_THRESHOLD
+            lines.append(f"🔄 Стратегия: Копирование в локальный кэш (< {limit} МБ)")
         else:
             strategy = "streaming"
-            print(f"🔄 Стратегия: Потоковая загрузка (> {self.LARGE_DATASET_THRESHOLD} МБ)")
-        
+            lines.append(f"🔄 Стратегия: Потоковая загрузка (> {self.LARGE_DATASET_THRESHOLD} МБ)")
+
+        sys.stdout.write("\n".join(lines) + "\n")
         return strategy
     
     def extract_archive(self, archive_path: str, extract_to: str) -> bool:
@@ -201,16 +201,51 @@ class AllanDatasetManager:
             print(f"❌ Ошибка копирования: {e}")
             return False
     
+    def _load_arrow_buffered(self, dataset_path: str):
+        """Чтение arrow-шардов одним большим буферизованным потоком.
+
+        На Colab Drive смонтирован через FUSE, где mmap не работает -
+        load_from_disk откатывается на мелкие постраничные чтения.
+        Открываем каждый шард обычным файлом с буфером 16 МБ и читаем
+        через pyarrow.ipc - получаем крупные последовательные чтения.
+        Возвращает None, если буферизованный путь недоступен.
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.ipc
+            from datasets import Dataset
+
+            arrow_files = sorted(
+                entry.path for entry in os.scandir(dataset_path)
+                if entry.name.endswith('.arrow')
+            )
+            if not arrow_files:
+                return None
+
+            tables = []
+            for shard_path in arrow_files:
+                with open(shard_path, 'rb', buffering=16 << 20) as f:
+                    tables.append(pa.ipc.open_file(f).read_all())
+
+            table = pa.concat_tables(tables) if len(tables) > 1 else tables[0]
+            return Dataset(table)
+
+        except Exception:
+            return None
+
     def load_dataset_direct(self, dataset_path: str, **kwargs):
         """Прямая загрузка датасета с Google Drive"""
         print("🔗 Прямая загрузка с Google Drive...")
-        
+
         try:
             from datasets import load_dataset, load_from_disk
-            
+
             if os.path.isdir(dataset_path):
-                # Загрузка сохраненного датасета
-                dataset = load_from_disk(dataset_path)
+                # Сначала пробуем буферизованное чтение arrow-шардов,
+                # иначе - стандартный load_from_disk
+                dataset = self._load_arrow_buffered(dataset_path)
+                if dataset is None:
+                    dataset = load_from_disk(dataset_path)
             else:
                 # Загрузка по имени/пути
                 dataset = load_dataset(dataset_path, **kwargs)
@@ -356,15 +391,19 @@ class AllanDatasetManager:
     
     def list_available_datasets(self):
         """Список доступных рекомендованных датасетов"""
-        print("📚 Рекомендованные датасеты для Allan:")
-        print("=" * 60)
-        
+        lines = ["📚 Рекомендованные датасеты для Allan:", "=" * 60]
+
         for name, info in self.recommended_datasets.items():
-            print(f"\n🔹 {name}")
-            print(f"  📊 Размер: {info.size_mb} МБ")
-            print(f"  🎯 Задача: {info.task_type}")
-            print(f"  📝 {info.description}")
-            print(f"  🔗 Путь: {info.path}")
+            lines.append(
+                f"\n🔹 {name}\n"
+                f"  📊 Размер: {info.size_mb} МБ\n"
+                f"  🎯 Задача: {info.task_type}\n"
+                f"  📝 {info.description}\n"
+                f"  🔗 Путь: {info.path}"
+            )
+
+        # Один write на весь список вместо ~30 print
+        sys.stdout.write("\n".join(lines) + "\n")
     
     def get_dataset_stats(self, dataset, dataset_name: str = "dataset"):
         """Получение статистики датасета"""
@@ -410,18 +449,22 @@ class AllanDatasetManager:
     
     def monitor_resources(self):
         """Мониторинг использования ресурсов"""
-        print("🔍 Мониторинг ресурсов:")
-        
+        lines = ["🔍 Мониторинг ресурсов:"]
+
         try:
+            # psutil нужен только здесь - ленивый импорт ускоряет
+            # import allan_dataset_manager для CLI-сценариев
+            import psutil
+
             # RAM
             memory = psutil.virtual_memory()
-            print(f"  🧠 RAM: {memory.percent:.1f}% использовано ({memory.used / (1024**3):.1f}/{memory.total / (1024**3):.1f} ГБ)")
-            
+            lines.append(f"  🧠 RAM: {memory.percent:.1f}% использовано ({memory.used / (1024**3):.1f}/{memory.total / (1024**3):.1f} ГБ)")
+
             # Диск
             disk = psutil.disk_usage("/content")
             disk_percent = (disk.used / disk.total) * 100
-            print(f"  💾 Диск: {disk_percent:.1f}% использовано ({disk.used / (1024**3):.1f}/{disk.total / (1024**3):.1f} ГБ)")
-            
+            lines.append(f"  💾 Диск: {disk_percent:.1f}% использовано ({disk.used / (1024**3):.1f}/{disk.total / (1024**3):.1f} ГБ)")
+
             # GPU (если доступен)
             try:
                 import torch
@@ -429,12 +472,14 @@ class AllanDatasetManager:
                     gpu_memory = torch.cuda.get_device_properties(0).total_memory
                     gpu_allocated = torch.cuda.memory_allocated(0)
                     gpu_percent = (gpu_allocated / gpu_memory) * 100
-                    print(f"  🎮 GPU: {gpu_percent:.1f}% использовано ({gpu_allocated / (1024**3):.1f}/{gpu_memory / (1024**3):.1f} ГБ)")
+                    lines.append(f"  🎮 GPU: {gpu_percent:.1f}% использовано ({gpu_allocated / (1024**3):.1f}/{gpu_memory / (1024**3):.1f} ГБ)")
             except:
                 pass
-                
+
         except Exception as e:
-            print(f"❌ Ошибка мониторинга: {e}")
+            lines.append(f"❌ Ошибка мониторинга: {e}")
+
+        sys.stdout.write("\n".join(lines) + "\n")
 
 
 def quick_load_dataset(dataset_name: str, **kwargs):
@@ -4,275 +4,47 @@ Allan Drive Structure Creator
 Создание оптимальной структуры папок на Google Drive для проекта Allan
 """
 
+import errno
+import functools
+import hashlib
 import os
 import json
-from pathlib import Path
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List
 from datetime import datetime
+import logging
 
-class AllanDriveStructure:
-    """Создатель структуры папок для проекта Allan на Google Drive"""
-    
-    def __init__(self, base_path: str = "/content/drive/MyDrive/ML_Projects/Allan_Model"):
-        self.base_path = base_path
-        self.structure = self._define_structure()
-    
-    def _define_structure(self) -> Dict:
-        """Определение полной структуры папок проекта"""
-        return {
-            "datasets": {
-                "description": "Все датасеты для обучения Allan",
-                "subfolders": {
-                    "raw": {
-                        "description": "Исходные необработанные датасеты",
-                        "subfolders": {
-                            "sberquad": {"description": "SberQuAD датасет (вопрос-ответ)"},
-                            "rucola": {"description": "RuCoLA датасет (лингвистическая приемлемость)"},
-                            "russian_superglue": {"description": "Russian SuperGLUE бенчмарк"},
-                            "lenta_news": {"description": "Новости Lenta.ru для генерации текста"},
-                            "russian_poems": {"description": "Русская поэзия для стилистики"},
-                            "custom": {"description": "Пользовательские датасеты"}
-                        }
-                    },
-                    "processed": {
-                        "description": "Обработанные и токенизированные датасеты",
-                        "subfolders": {
-                            "tokenized": {"description": "Токенизированные датасеты"},
-                            "filtered": {"description": "Отфильтрованные датасеты"},
-                            "augmented": {"description": "Дополненные данные"}
-                        }
-                    },
-                    "cached": {
-                        "description": "Кэшированные датасеты для быстрого доступа",
-                        "subfolders": {
-                            "hf_cache": {"description": "Кэш Hugging Face датасетов"},
-                            "preprocessed": {"description": "Предобработанные данные"}
-                        }
-                    },
-                    "splits": {
-                        "description": "Разделения датасетов на train/val/test",
-                        "subfolders": {
-                            "train": {"description": "Тренировочные данные"},
-                            "validation": {"description": "Валидационные данные"},
-                            "test": {"description": "Тестовые данные"}
-                        }
-                    }
-                }
-            },
-            "models": {
-                "description": "Модели Allan и связанные артефакты",
-                "subfolders": {
-                    "checkpoints": {
-                        "description": "Чекпоинты во время обучения",
-                        "subfolders": {
-                            "epoch_checkpoints": {"description": "Чекпоинты по эпохам"},
-                            "best_checkpoints": {"description": "Лучшие чекпоинты по метрикам"},
-                            "backup_checkpoints": {"description": "Резервные копии чекпоинтов"}
-                        }
-                    },
-                    "final": {
-                        "description": "Финальные обученные модели",
-                        "subfolders": {
-                            "allan_v1": {"description": "Allan версия 1.0"},
-                            "allan_v2": {"description": "Allan версия 2.0"},
-                            "experimental": {"description": "Экспериментальные версии"}
-                        }
-                    },
-                    "tokenizers": {
-                        "description": "Токенизаторы для разных версий Allan",
-                        "subfolders": {
-                            "custom_tokenizers": {"description": "Пользовательские токенизаторы"},
-                            "pretrained_tokenizers": {"description": "Предобученные токенизаторы"}
-                        }
-                    },
-                    "base_models": {
-                        "description": "Базовые модели для файн-тюнинга",
-                        "subfolders": {
-                            "rubert": {"description": "RuBERT модели"},
-                            "rugpt": {"description": "ruGPT модели"},
-                            "other": {"description": "Другие базовые модели"}
-                        }
-                    }
-                }
-            },
-            "configs": {
-                "description": "Конфигурационные файлы",
-                "subfolders": {
-                    "training": {"description": "Конфиги для обучения"},
-                    "model": {"description": "Архитектурные конфиги моделей"},
-                    "data": {"description": "Конфиги обработки данных"},
-                    "evaluation": {"description": "Конфиги для оценки"}
-                }
-            },
-            "scripts": {
-                "description": "Скрипты для различных задач",
-                "subfolders": {
-                    "training": {"description": "Скрипты обучения"},
-                    "evaluation": {"description": "Скрипты оценки"},
-                    "data_processing": {"description": "Обработка данных"},
-                    "utils": {"description": "Утилиты"}
-                }
-            },
-            "notebooks": {
-                "description": "Jupyter ноутбуки для экспериментов",
-                "subfolders": {
-                    "experiments": {"description": "Экспериментальные ноутбуки"},
-                    "analysis": {"description": "Анализ данных и результатов"},
-                    "demos": {"description": "Демонстрационные ноутбуки"},
-                    "tutorials": {"description": "Обучающие материалы"}
-                }
-            },
-            "logs": {
-                "description": "Логи обучения и экспериментов",
-                "subfolders": {
-                    "tensorboard": {
-                        "description": "Логи TensorBoard",
-                        "subfolders": {
-                            "training": {"description": "Логи обучения"},
-                            "validation": {"description": "Логи валидации"}
-                        }
-                    },
-                    "wandb": {
-                        "description": "Weights & Biases логи",
-                        "subfolders": {
-                            "runs": {"description": "Отдельные запуски"},
-                            "sweeps": {"description": "Sweep эксперименты"}
-                        }
-                    },
-                    "training_logs": {"description": "Текстовые логи обучения"},
-                    "error_logs": {"description": "Логи ошибок"}
-                }
-            },
-            "results": {
-                "description": "Результаты экспериментов и оценки",
-                "subfolders": {
-                    "metrics": {"description": "Метрики производительности"},
-                    "predictions": {"description": "Предсказания модели"},
-                    "evaluations": {"description": "Результаты оценки"},
-                    "comparisons": {"description": "Сравнения моделей"},
-                    "reports": {"description": "Отчеты и анализы"}
-                }
-            },
-            "cache": {
-                "description": "Различные кэши для ускорения работы",
-                "subfolders": {
-                    "huggingface": {"description": "Кэш Hugging Face"},
-                    "transformers": {"description": "Кэш Transformers"},
-                    "datasets": {"description": "Кэш датасетов"},
-                    "torch": {"description": "Кэш PyTorch"},
-                    "temp": {"description": "Временные файлы"}
-                }
-            },
-            "docs": {
-                "description": "Документация проекта",
-                "subfolders": {
-                    "model_docs": {"description": "Документация модели"},
-                    "api_docs": {"description": "API документация"},
-                    "user_guides": {"description": "Руководства пользователя"},
-                    "research_notes": {"description": "Исследовательские заметки"}
-                }
-            },
-            "tools": {
-                "description": "Инструменты и утилиты",
-                "subfolders": {
-                    "monitoring": {"description": "Инструменты мониторинга"},
-                    "visualization": {"description": "Визуализация"},
-                    "deployment": {"description": "Деплоймент утилиты"},
-                    "benchmarking": {"description": "Бенчмарки"}
-                }
-            }
-        }
-    
-    def create_folder_with_readme(self, folder_path: str, description: str):
-        """Создание папки с README файлом"""
-        try:
-            # Создание папки
-            os.makedirs(folder_path, exist_ok=True)
-            
-            # Создание README файла
-            readme_path = os.path.join(folder_path, "README.md")
-            if not os.path.exists(readme_path):
-                with open(readme_path, 'w', encoding='utf-8') as f:
-                    folder_name = os.path.basename(folder_path)
-                    f.write(f"# {folder_name.upper()}\n\n")
-                    f.write(f"{description}\n\n")
-                    f.write(f"Создано: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                    f.write(f"Проект: Allan Model\n\n")
-                    f.write("## Содержимое\n\n")
-                    f.write("_Папка пока пуста. Файлы будут добавлены в процессе работы._\n")
-            
-            return True
-            
-        except Exception as e:
-            print(f"❌ Ошибка создания папки {folder_path}: {e}")
-            return False
-    
-    def create_structure_recursive(self, structure: Dict, current_path: str, level: int = 0):
-        """Рекурсивное создание структуры папок"""
-        created_count = 0
-        
-        for name, info in structure.items():
-            folder_path = os.path.join(current_path, name)
-            description = info.get("description", f"Папка {name}")
-            
-            # Создание папки с README
-            if self.create_folder_with_readme(folder_path, description):
-                created_count += 1
-                indent = "  " * level
-                print(f"{indent}📁 {name} - {description}")
-            
-            # Рекурсивное создание подпапок
-            if "subfolders" in info:
-                sub_created = self.create_structure_recursive(
-                    info["subfolders"], 
-                    folder_path, 
-                    level + 1
-                )
-                created_count += sub_created
-        
-        return created_count
-    
-    def create_project_structure(self) -> bool:
-        """Создание полной структуры проекта Allan"""
-        print("🚀 Создание структуры проекта Allan на Google Drive...")
-        print("=" * 60)
-        print(f"📍 Базовый путь: {self.base_path}")
-        print()
-        
-        try:
-            # Создание базовой папки проекта
-            os.makedirs(self.base_path, exist_ok=True)
-            
-            # Создание главного README
-            self.create_main_readme()
-            
-            # Создание структуры папок
-            total_created = self.create_structure_recursive(self.structure, self.base_path)
-            
-            # Создание дополнительных файлов
-            self.create_project_files()
-            
-            print(f"\n✅ Структура создана успешно!")
-            print(f"📊 Создано папок: {total_created}")
-            print(f"📁 Базовый путь: {self.base_path}")
-            
-            return True
-            
-        except Exception as e:
-            print(f"❌ Ошибка создания структуры: {e}")
-            return False
-    
-    def create_main_readme(self):
-        """Создание главного README файла проекта"""
-        readme_path = os.path.join(self.base_path, "README.md")
-        
-        content = f"""# 🔥 Allan Model Project
+# Подробный прогресс провижининга - через логгер (по умолчанию молчит;
+# для отладки: logging.getLogger('allan.drive').setLevel(logging.DEBUG))
+log = logging.getLogger('allan.drive')
+
+# orjson сериализует мелкие dict ~10x быстрее stdlib и отдает bytes -
+# конфиг пишется одной бинарной записью по FUSE; fallback на stdlib
+try:
+    import orjson
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+# Шаблоны файлов проекта собираются один раз при загрузке модуля;
+# подставляется только временная метка. .gitignore и requirements
+# заранее закодированы в bytes - запись без повторного utf-8 encode
+_README_TMPL = """# 🔥 Allan Model Project
 
 Проект обучения русскоязычной языковой модели Allan с использованием Google Colab и Google Drive.
 
 ## 📊 Информация о проекте
 
-- **Создан**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+- **Создан**: {ts}
 - **Платформа**: Google Colab + Google Drive
 - **Язык**: Русский
 - **Фреймворк**: PyTorch + Transformers
@@ -351,18 +123,8 @@ dataset = quick_load_dataset("sberquad")
 
 **Allan Model** - Создавая будущее русскоязычного NLP 🚀
 """
-        
-        with open(readme_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        
-        print("📄 Главный README создан")
-    
-    def create_project_files(self):
-        """Создание дополнительных файлов проекта"""
-        
-        # .gitignore для случая если проект будет версионироваться
-        gitignore_path = os.path.join(self.base_path, ".gitignore")
-        gitignore_content = """# Allan Model .gitignore
+
+_GITIGNORE: bytes = """# Allan Model .gitignore
 
 # Датасеты и кэш
 datasets/raw/
@@ -411,16 +173,9 @@ __pycache__/
 # Окружение
 .env
 .venv/
-"""
-        
-        with open(gitignore_path, 'w', encoding='utf-8') as f:
-            f.write(gitignore_content)
-        
-        print("📄 .gitignore создан")
-        
-        # requirements.txt
-        requirements_path = os.path.join(self.base_path, "requirements.txt")
-        requirements_content = """# Allan Model Requirements
+""".encode('utf-8')
+
+_REQUIREMENTS: bytes = """# Allan Model Requirements
 
 # Основные библиотеки
 torch>=2.0.0
@@ -452,19 +207,635 @@ seaborn>=0.12.0
 tqdm>=4.65.0
 numpy>=1.24.0
 pandas>=2.0.0
-"""
+""".encode('utf-8')
+
+
+def _define_structure() -> Dict:
+    """Определение полной структуры папок проекта"""
+    return {
+        "datasets": {
+            "description": "Все датасеты для обучения Allan",
+            "subfolders": {
+                "raw": {
+                    "description": "Исходные необработанные датасеты",
+                    "subfolders": {
+                        "sberquad": {"description": "SberQuAD датасет (вопрос-ответ)"},
+                        "rucola": {"description": "RuCoLA датасет (лингвистическая приемлемость)"},
+                        "russian_superglue": {"description": "Russian SuperGLUE бенчмарк"},
+                        "lenta_news": {"description": "Новости Lenta.ru для генерации текста"},
+                        "russian_poems": {"description": "Русская поэзия для стилистики"},
+                        "custom": {"description": "Пользовательские датасеты"}
+                    }
+                },
+                "processed": {
+                    "description": "Обработанные и токенизированные датасеты",
+                    "subfolders": {
+                        "tokenized": {"description": "Токенизированные датасеты"},
+                        "filtered": {"description": "Отфильтрованные датасеты"},
+                        "augmented": {"description": "Дополненные данные"}
+                    }
+                },
+                "cached": {
+                    "description": "Кэшированные датасеты для быстрого доступа",
+                    "subfolders": {
+                        "hf_cache": {"description": "Кэш Hugging Face датасетов"},
+                        "preprocessed": {"description": "Предобработанные данные"}
+                    }
+                },
+                "splits": {
+                    "description": "Разделения датасетов на train/val/test",
+                    "subfolders": {
+                        "train": {"description": "Тренировочные данные"},
+                        "validation": {"description": "Валидационные данные"},
+                        "test": {"description": "Тестовые данные"}
+                    }
+                }
+            }
+        },
+        "models": {
+            "description": "Модели Allan и связанные артефакты",
+            "subfolders": {
+                "checkpoints": {
+                    "description": "Чекпоинты во время обучения",
+                    "subfolders": {
+                        "epoch_checkpoints": {"description": "Чекпоинты по эпохам"},
+                        "best_checkpoints": {"description": "Лучшие чекпоинты по метрикам"},
+                        "backup_checkpoints": {"description": "Резервные копии чекпоинтов"}
+                    }
+                },
+                "final": {
+                    "description": "Финальные обученные модели",
+                    "subfolders": {
+                        "allan_v1": {"description": "Allan версия 1.0"},
+                        "allan_v2": {"description": "Allan версия 2.0"},
+                        "experimental": {"description": "Экспериментальные версии"}
+                    }
+                },
+                "tokenizers": {
+                    "description": "Токенизаторы для разных версий Allan",
+                    "subfolders": {
+                        "custom_tokenizers": {"description": "Пользовательские токенизаторы"},
+                        "pretrained_tokenizers": {"description": "Предобученные токенизаторы"}
+                    }
+                },
+                "base_models": {
+                    "description": "Базовые модели для файн-тюнинга",
+                    "subfolders": {
+                        "rubert": {"description": "RuBERT модели"},
+                        "rugpt": {"description": "ruGPT модели"},
+                        "other": {"description": "Другие базовые модели"}
+                    }
+                }
+            }
+        },
+        "configs": {
+            "description": "Конфигурационные файлы",
+            "subfolders": {
+                "training": {"description": "Конфиги для обучения"},
+                "model": {"description": "Архитектурные конфиги моделей"},
+                "data": {"description": "Конфиги обработки данных"},
+                "evaluation": {"description": "Конфиги для оценки"}
+            }
+        },
+        "scripts": {
+            "description": "Скрипты для различных задач",
+            "subfolders": {
+                "training": {"description": "Скрипты обучения"},
+                "evaluation": {"description": "Скрипты оценки"},
+                "data_processing": {"description": "Обработка данных"},
+                "utils": {"description": "Утилиты"}
+            }
+        },
+        "notebooks": {
+            "description": "Jupyter ноутбуки для экспериментов",
+            "subfolders": {
+                "experiments": {"description": "Экспериментальные ноутбуки"},
+                "analysis": {"description": "Анализ данных и результатов"},
+                "demos": {"description": "Демонстрационные ноутбуки"},
+                "tutorials": {"description": "Обучающие материалы"}
+            }
+        },
+        "logs": {
+            "description": "Логи обучения и экспериментов",
+            "subfolders": {
+                "tensorboard": {
+                    "description": "Логи TensorBoard",
+                    "subfolders": {
+                        "training": {"description": "Логи обучения"},
+                        "validation": {"description": "Логи валидации"}
+                    }
+                },
+                "wandb": {
+                    "description": "Weights & Biases логи",
+                    "subfolders": {
+                        "runs": {"description": "Отдельные запуски"},
+                        "sweeps": {"description": "Sweep эксперименты"}
+                    }
+                },
+                "training_logs": {"description": "Текстовые логи обучения"},
+                "error_logs": {"description": "Логи ошибок"}
+            }
+        },
+        "results": {
+            "description": "Результаты экспериментов и оценки",
+            "subfolders": {
+                "metrics": {"description": "Метрики производительности"},
+                "predictions": {"description": "Предсказания модели"},
+                "evaluations": {"description": "Результаты оценки"},
+                "comparisons": {"description": "Сравнения моделей"},
+                "reports": {"description": "Отчеты и анализы"}
+            }
+        },
+        "cache": {
+            "description": "Различные кэши для ускорения работы",
+            "subfolders": {
+                "huggingface": {"description": "Кэш Hugging Face"},
+                "transformers": {"description": "Кэш Transformers"},
+                "datasets": {"description": "Кэш датасетов"},
+                "torch": {"description": "Кэш PyTorch"},
+                "temp": {"description": "Временные файлы"}
+            }
+        },
+        "docs": {
+            "description": "Документация проекта",
+            "subfolders": {
+                "model_docs": {"description": "Документация модели"},
+                "api_docs": {"description": "API документация"},
+                "user_guides": {"description": "Руководства пользователя"},
+                "research_notes": {"description": "Исследовательские заметки"}
+            }
+        },
+        "tools": {
+            "description": "Инструменты и утилиты",
+            "subfolders": {
+                "monitoring": {"description": "Инструменты мониторинга"},
+                "visualization": {"description": "Визуализация"},
+                "deployment": {"description": "Деплоймент утилиты"},
+                "benchmarking": {"description": "Бенчмарки"}
+            }
+        }
+    }
+
+
+def _flatten(structure: Dict):
+    """Разворачивание дерева в кортежи (отн_путь, описание, глубина)"""
+    stack = deque()
+    for name, info in reversed(structure.items()):
+        stack.append((name, info, "", 0))
+
+    while stack:
+        name, info, parent, level = stack.pop()
+        path = f"{parent}/{name}" if parent else name
+        yield path, info.get("description", f"Папка {name}"), level
+
+        subfolders = info.get("subfolders")
+        if subfolders:
+            for sub_name, sub_info in reversed(subfolders.items()):
+                stack.append((sub_name, sub_info, path, level + 1))
+
+
+# Структура статична, но нужна не каждому сценарию (например, summary
+# только считает папки): строим дерево и плоскую форму лениво, один раз
+# на модуль, а не на каждый экземпляр (~80 вложенных dict на вызов)
+@functools.lru_cache(maxsize=None)
+def _structure() -> Dict:
+    return _define_structure()
+
+
+@functools.lru_cache(maxsize=None)
+def _structure_tuples() -> tuple:
+    return tuple(_flatten(_structure()))
+
+
+# Частичное вычисление статичных производных: количество папок и
+# отрисованное дерево считаются один раз и переиспользуются
+@functools.lru_cache(maxsize=None)
+def _total_folders() -> int:
+    return len(_structure_tuples())
+
+
+@functools.lru_cache(maxsize=None)
+def _tree_str() -> str:
+    lines = ["🌳 Структура проекта Allan:", "=" * 40]
+    for rel_path, description, level in _structure_tuples():
+        indent = "  " * level
+        icon = "📁" if level == 0 else "└─"
+        name = rel_path.rsplit('/', 1)[-1]
+        lines.append(f"{indent}{icon} {name} - {description}")
+    return "\n".join(lines) + "\n"
+
+
+class AllanDriveStructure:
+    """Создатель структуры папок для проекта Allan на Google Drive"""
+
+    def __init__(self, base_path: str = "/content/drive/MyDrive/ML_Projects/Allan_Model"):
+        self.base_path = base_path
+        # Нормализованный префикс считаем один раз: _walk дальше только
+        # конкатенирует строки, без повторного разбора пути
+        self._base = base_path.rstrip('/')
+        # Единая метка времени запуска: один gettimeofday + strftime
+        # вместо вызова в каждом методе
+        self._run_ts = datetime.now()
+        self._run_ts_str = self._run_ts.strftime('%Y-%m-%d %H:%M:%S')
+        # Сколько папок не удалось создать в последнем проходе
+        # create_structure_recursive - по этому счетчику решается,
+        # можно ли записывать манифест
+        self._last_failed = 0
+
+    @functools.cached_property
+    def structure(self) -> Dict:
+        """Дерево структуры (материализуется при первом обращении)"""
+        return _structure()
+
+    # errno, которые Drive FUSE выдает при временных сбоях (429 и т.п.)
+    _TRANSIENT_ERRNO = frozenset({errno.EBUSY, errno.EIO, errno.EAGAIN})
+
+    def _with_backoff(self, fn, *args, max_retries: int = 6):
+        """Повтор операции с экспоненциальной задержкой.
+
+        Drive FUSE транслирует rate-limit (429) в транзиентные OSError;
+        без повторов скрипт бросает частично созданное дерево. Пауза
+        растет 1с, 2с, 4с... до 32с, с джиттером против синхронных
+        повторов из параллельных потоков.
+        """
+        for attempt in range(max_retries):
+            try:
+                return fn(*args)
+            except OSError as e:
+                transient = (e.errno in self._TRANSIENT_ERRNO
+                             or "rateLimit" in str(e))
+                if not transient or attempt == max_retries - 1:
+                    raise
+                delay = min(32, 2 ** attempt) + random.random()
+                self._log_retry(fn.__name__, attempt + 1, delay, e)
+                time.sleep(delay)
+
+    def _log_retry(self, op: str, attempt: int, delay: float, error: OSError):
+        """Запись повторов в results/metrics/provision.log (если возможно)"""
+        try:
+            log_dir = os.path.join(self.base_path, "results", "metrics")
+            os.makedirs(log_dir, exist_ok=True)
+            with open(os.path.join(log_dir, "provision.log"), 'a', encoding='utf-8') as f:
+                f.write(f"{datetime.now().isoformat()} retry={attempt} op={op} "
+                        f"delay={delay:.1f}s error={error}\n")
+        except OSError:
+            pass
+
+    def _make_folder(self, folder_path: str):
+        """Одна попытка создания папки (может бросить OSError).
+
+        Обход идет от родителей к детям, поэтому достаточно одного
+        os.mkdir - без обхода предков внутри os.makedirs (лишние stat
+        на каждом уровне). makedirs остается запасным путем, если папку
+        создают вне обхода и родителя еще нет.
+        """
+        try:
+            os.mkdir(folder_path)
+        except FileExistsError:
+            pass
+        except FileNotFoundError:
+            os.makedirs(folder_path, exist_ok=True)
+
+    def create_folder(self, folder_path: str):
+        """Создание папки (с повторами при сбоях Drive)"""
+        try:
+            self._with_backoff(self._make_folder, folder_path)
+            return True
+
+        except Exception as e:
+            print(f"❌ Ошибка создания папки {folder_path}: {e}")
+            return False
+
+    def create_manifest(self, target_dir: str = None):
+        """Создание единого MANIFEST.md с описанием всех папок.
+
+        Вместо ~80 README.md (каждый - create + write по FUSE, сотни мс)
+        пишем один сводный индекс в корне проекта: одна крупная запись
+        вместо множества мелких.
+        """
+        lines = [
+            "# 📁 Allan Model - Структура проекта",
+            "",
+            f"Создано: {self._run_ts_str}",
+            "",
+        ]
+        for rel_path, description, level in _structure_tuples():
+            indent = "  " * level
+            name = rel_path.rsplit('/', 1)[-1]
+            lines.append(f"{indent}- **{name}** (`{rel_path}/`) - {description}")
+
+        manifest_path = os.path.join(target_dir or self.base_path, "MANIFEST.md")
+        body = "\n".join(lines) + "\n"
+        # Одна бинарная запись: кодируем заранее, без текстовой обертки
+        with open(manifest_path, 'wb') as f:
+            f.write(body.encode('utf-8'))
+
+        print("📄 MANIFEST.md создан")
+    
+    def _walk(self, structure: Dict, base: str):
+        """Плоский обход дерева структуры без рекурсии.
+
+        Для стандартной структуры отдает заранее развернутые кортежи
+        _structure_tuples() (строятся лениво, один раз); произвольный
+        dict разворачивается через _flatten. Пути на Colab всегда POSIX,
+        поэтому склеиваем строки напрямую.
+        """
+        base = self._base if base == self.base_path else base.rstrip('/')
+        tuples = _structure_tuples() if structure is _structure() else _flatten(structure)
+        for rel_path, description, level in tuples:
+            yield f"{base}/{rel_path}", description, level
+
+    def _filter_existing(self, group: List[tuple]) -> List[tuple]:
+        """Отсев уже существующих папок одним readdir на родителя.
+
+        Вместо mkdir-попытки на каждый узел (N round-trip по FUSE) -
+        один os.scandir на родительскую папку и сравнение множеств имен.
+        На полностью созданном дереве это ~10 readdir вместо ~80 mkdir.
+        """
+        by_parent: Dict[str, List[tuple]] = {}
+        for node in group:
+            by_parent.setdefault(os.path.dirname(node[0]), []).append(node)
+
+        missing: List[tuple] = []
+        for parent, nodes in by_parent.items():
+            try:
+                existing = {entry.name for entry in os.scandir(parent)}
+            except OSError:
+                # Родителя еще нет (или недоступен) - создаем все
+                missing.extend(nodes)
+                continue
+            missing.extend(
+                node for node in nodes
+                if os.path.basename(node[0]) not in existing
+            )
+        return missing
+
+    def create_structure_recursive(self, structure: Dict, current_path: str, level: int = 0):
+        """Создание структуры папок (параллельно, уровень за уровнем)
+
+        mkdir и запись README на Drive FUSE упираются в латентность сети,
+        а не в CPU, поэтому узлы одного уровня создаются параллельно в
+        ThreadPoolExecutor. Между уровнями - барьер: родители должны
+        существовать раньше детей.
+
+        Неудачи (create_folder вернул False после всех повторов)
+        подсчитываются в self._last_failed.
+        """
+        created_count = 0
+        failed_count = 0
+
+        # Группировка плоского обхода по глубине
+        by_depth: Dict[int, List[tuple]] = {}
+        for folder_path, description, depth in self._walk(structure, current_path):
+            by_depth.setdefault(depth, []).append((folder_path, description))
+
+        debug = log.isEnabledFor(logging.DEBUG)
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            for depth in sorted(by_depth):
+                group = self._filter_existing(by_depth[depth])
+                results = list(executor.map(
+                    lambda node: self.create_folder(node[0]), group
+                ))
+                ok = sum(results)
+                created_count += ok
+                failed_count += len(results) - ok
+                # Прогресс по папкам - только на уровне DEBUG: 80 print
+                # в ноутбуке - это 80 сообщений во фронтенд
+                if debug:
+                    for (folder_path, description), ok in zip(group, results):
+                        if ok:
+                            indent = "  " * (level + depth)
+                            log.debug("%s📁 %s - %s", indent,
+                                      os.path.basename(folder_path), description)
+
+        self._last_failed = failed_count
+        return created_count
+    
+    def create_structure_via_drive_api(self, service, root_folder_id: str = "root") -> int:
+        """Создание структуры через Drive API v3 батчами вместо FUSE.
+
+        Каждый mkdir через Drive FUSE - отдельный HTTP round-trip
+        (~150 мс). Drive API позволяет объединить до 100 запросов в один
+        multipart/mixed batch. Папки одного уровня создаются одним
+        батчем; уровни идут по очереди, т.к. детям нужны ID родителей.
+
+        service - авторизованный googleapiclient Drive v3 сервис.
+        Возвращает количество созданных папок.
+        """
+        # Разворачиваем дерево в уровни: [(родительский_путь, имя), ...]
+        levels: List[List[tuple]] = []
+        current = [("", name, info) for name, info in self.structure.items()]
+        while current:
+            levels.append([(parent, name) for parent, name, _ in current])
+            next_level = []
+            for parent, name, info in current:
+                path = f"{parent}/{name}" if parent else name
+                for sub_name, sub_info in info.get("subfolders", {}).items():
+                    next_level.append((path, sub_name, sub_info))
+            current = next_level
+
+        folder_ids = {"": root_folder_id}
+        created_count = 0
+        folder_mime = "application/vnd.google-apps.folder"
+
+        def _capture(path):
+            def callback(request_id, response, exception):
+                nonlocal created_count
+                if exception is not None:
+                    print(f"❌ Drive API: ошибка создания {path}: {exception}")
+                else:
+                    folder_ids[path] = response["id"]
+                    created_count += 1
+            return callback
+
+        def _prepare(level):
+            # Все, что не зависит от ID родителей: пути и тела запросов
+            # (parents подставляется после ответа предыдущего уровня)
+            return [
+                (parent, f"{parent}/{name}" if parent else name,
+                 {"name": name, "mimeType": folder_mime})
+                for parent, name in level
+            ]
+
+        # Конвейер: пока батч уровня K ждет ответа Drive (медиана ~160 мс,
+        # хвост - секунды), рабочий поток уже собирает тела уровня K+1
+        with ThreadPoolExecutor(max_workers=1) as worker:
+            prepared = _prepare(levels[0]) if levels else []
+            for i in range(len(levels)):
+                next_future = (worker.submit(_prepare, levels[i + 1])
+                               if i + 1 < len(levels) else None)
+
+                # Drive API ограничивает batch сотней под-запросов
+                for start in range(0, len(prepared), 100):
+                    batch = service.new_batch_http_request()
+                    for parent, path, body in prepared[start:start + 100]:
+                        # Родитель мог не создаться (ошибка в его батче) -
+                        # тогда его ID нет, и ветку пропускаем целиком
+                        parent_id = folder_ids.get(parent)
+                        if parent_id is None:
+                            print(f"❌ Drive API: пропуск {path}: "
+                                  f"родитель {parent} не создан")
+                            continue
+                        batch.add(
+                            service.files().create(
+                                body={**body, "parents": [parent_id]},
+                                fields="id",
+                            ),
+                            callback=_capture(path),
+                        )
+                    batch.execute()
+
+                prepared = next_future.result() if next_future else []
+
+        print(f"✅ Drive API: создано папок: {created_count}")
+        return created_count
+
+    def _structure_key(self) -> str:
+        """SHA256 от определения структуры - ключ кэша провижининга"""
+        payload = json.dumps(self.structure, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.base_path, ".allan_structure.json")
+
+    def _is_already_provisioned(self, key: str) -> bool:
+        """Проверка манифеста: совпадает ли ключ с прошлым запуском"""
+        try:
+            with open(self._manifest_path(), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            return manifest.get("version") == 1 and manifest.get("key") == key
+        except (OSError, ValueError):
+            return False
+
+    def _write_manifest(self, key: str):
+        manifest = {
+            "version": 1,
+            "key": key,
+            "provisioned_at": self._run_ts.isoformat(),
+        }
+        with open(self._manifest_path(), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+    def _provision_from_template(self) -> int:
+        """Сборка структуры в /tmp и перенос на Drive одним copytree.
+
+        Создание ~80 папок напрямую по FUSE - это ~80 сетевых round-trip.
+        Локальный диск Colab делает те же mkdir за миллисекунды, а
+        shutil.copytree переносит готовое дерево одним проходом
+        (os.scandir + sendfile для файлов). Drive видит массовый перенос
+        вместо россыпи мелких операций.
+        """
+        tmp_root = tempfile.mkdtemp(prefix="allan_template_")
+        try:
+            # Кортежи идут от родителей к детям - хватает голого mkdir
+            for rel_path, _, _ in _structure_tuples():
+                try:
+                    os.mkdir(f"{tmp_root}/{rel_path}")
+                except FileExistsError:
+                    pass
+
+            # Файлы проекта тоже пишем в шаблон - уедут тем же переносом
+            self.create_main_readme(tmp_root)
+            self.create_manifest(tmp_root)
+            self.create_project_files(tmp_root)
+
+            shutil.copytree(tmp_root, self.base_path, dirs_exist_ok=True)
+        finally:
+            shutil.rmtree(tmp_root, ignore_errors=True)
+
+        return len(_structure_tuples())
+
+    def create_project_structure(self) -> bool:
+        """Создание полной структуры проекта Allan"""
+        print("🚀 Создание структуры проекта Allan на Google Drive...")
+        print("=" * 60)
+        print(f"📍 Базовый путь: {self.base_path}")
+        print()
+
+        # Обновляем метку запуска: все файлы этого запуска получают
+        # одно и то же время
+        self._run_ts = datetime.now()
+        self._run_ts_str = self._run_ts.strftime('%Y-%m-%d %H:%M:%S')
+
+        # Повторный запуск с той же структурой - O(1): один stat базовой
+        # папки и одно чтение манифеста вместо обхода всего дерева
+        key = self._structure_key()
+        if os.path.isdir(self.base_path) and self._is_already_provisioned(key):
+            print("✅ Структура уже создана (манифест совпадает), пропускаем")
+            return True
+
+        try:
+            # Создание базовой папки проекта
+            os.makedirs(self.base_path, exist_ok=True)
+
+            try:
+                # Основной путь: собрать все локально и перенести одним
+                # copytree (мелкие операции достаются локальному диску)
+                total_created = self._provision_from_template()
+            except OSError:
+                # Запасной путь: создание напрямую на Drive
+                self.create_main_readme()
+                total_created = self.create_structure_recursive(self.structure, self.base_path)
+                self.create_manifest()
+                self.create_project_files()
+                if self._last_failed:
+                    # Манифест не пишем: иначе повторный запуск увидит
+                    # совпавший ключ и навсегда оставит дыры в дереве
+                    print(f"\n⚠️  Не создано папок: {self._last_failed}")
+                    print("📝 Манифест не записан - повторный запуск достроит структуру")
+                    return False
+
+            # Фиксируем успешный запуск для быстрых повторов
+            self._write_manifest(key)
+
+            print(f"\n✅ Структура создана успешно!")
+            print(f"📊 Создано папок: {total_created}")
+            print(f"📁 Базовый путь: {self.base_path}")
+            
+            return True
+            
+        except Exception as e:
+            print(f"❌ Ошибка создания структуры: {e}")
+            return False
+    
+    def create_main_readme(self, target_dir: str = None):
+        """Создание главного README файла проекта"""
+        readme_path = os.path.join(target_dir or self.base_path, "README.md")
         
-        with open(requirements_path, 'w', encoding='utf-8') as f:
-            f.write(requirements_content)
+        content = _README_TMPL.format(ts=self._run_ts_str)
+
+        # Одна запись байтов вместо текстовой обертки поверх FUSE
+        with open(readme_path, 'wb') as f:
+            f.write(content.encode('utf-8'))
+        
+        print("📄 Главный README создан")
+    
+    def create_project_files(self, target_dir: str = None):
+        """Создание дополнительных файлов проекта"""
+        target_dir = target_dir or self.base_path
+
+        # .gitignore для случая если проект будет версионироваться
+        gitignore_path = os.path.join(target_dir, ".gitignore")
+        
+        with open(gitignore_path, 'wb') as f:
+            f.write(_GITIGNORE)
+        
+        print("📄 .gitignore создан")
+        
+        # requirements.txt
+        requirements_path = os.path.join(target_dir, "requirements.txt")
+        
+        with open(requirements_path, 'wb') as f:
+            f.write(_REQUIREMENTS)
         
         print("📄 requirements.txt создан")
         
         # Конфиг проекта в JSON
-        config_path = os.path.join(self.base_path, "project_config.json")
+        config_path = os.path.join(target_dir, "project_config.json")
         config_content = {
             "project_name": "Allan Model",
             "version": "1.0.0",
-            "created": datetime.now().isoformat(),
+            "created": self._run_ts.isoformat(),
             "platform": "Google Colab + Google Drive",
             "language": "Russian",
             "base_path": self.base_path,
@@ -481,45 +852,43 @@ pandas>=2.0.0
             "recommended_datasets": list(self.structure["datasets"]["subfolders"]["raw"]["subfolders"].keys())
         }
         
-        with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump(config_content, f, indent=2, ensure_ascii=False)
-        
+        with open(config_path, 'wb') as f:
+            f.write(_json_dumps(config_content))
+
         print("📄 project_config.json создан")
     
     def get_structure_summary(self) -> Dict:
         """Получение сводки о созданной структуре"""
-        def count_folders(structure):
-            count = len(structure)
-            for item in structure.values():
-                if "subfolders" in item:
-                    count += count_folders(item["subfolders"])
-            return count
-        
-        total_folders = count_folders(self.structure)
-        
+        # Константа структуры: считается один раз, без обхода дерева
+        total_folders = _total_folders()
+
         return {
             "base_path": self.base_path,
             "total_folders": total_folders,
             "main_categories": len(self.structure),
-            "created_at": datetime.now().isoformat()
+            "created_at": self._run_ts.isoformat()
         }
     
     def print_structure_tree(self, structure: Dict = None, level: int = 0):
-        """Печать дерева структуры папок"""
+        """Печать дерева структуры папок одной записью в stdout.
+
+        Для стандартной структуры используется закэшированная строка
+        _tree_str(); произвольный dict рендерится в буфер. В обоих
+        случаях - один write вместо ~80 print (каждый print в ноутбуке
+        уходит отдельным сообщением во фронтенд).
+        """
         if structure is None:
-            structure = self.structure
-            print("🌳 Структура проекта Allan:")
-            print("=" * 40)
-        
-        for name, info in structure.items():
-            indent = "  " * level
-            icon = "📁" if level == 0 else "└─" if level > 0 else ""
-            description = info.get("description", "")
-            
-            print(f"{indent}{icon} {name} - {description}")
-            
-            if "subfolders" in info:
-                self.print_structure_tree(info["subfolders"], level + 1)
+            sys.stdout.write(_tree_str())
+            return
+
+        lines = []
+        for rel_path, description, depth in _flatten(structure):
+            indent = "  " * (level + depth)
+            icon = "📁" if level + depth == 0 else "└─"
+            name = rel_path.rsplit('/', 1)[-1]
+            lines.append(f"{indent}{icon} {name} - {description}")
+
+        sys.stdout.write("\n".join(lines) + "\n")
 
 
 def create_allan_drive_structure(base_path: str = None) -> bool:
@@ -532,20 +901,21 @@ def create_allan_drive_structure(base_path: str = None) -> bool:
 
 
 def print_allan_structure():
-    """Быстрая функция для просмотра структуры"""
-    creator = AllanDriveStructure()
-    creator.print_structure_tree()
+    """Быстрая функция для просмотра структуры.
+
+    Работает с закэшированной строкой дерева напрямую - без создания
+    экземпляра и каких-либо обходов.
+    """
+    sys.stdout.write(_tree_str())
 
 
 if __name__ == "__main__":
     # Демонстрация создания структуры
-    creator = AllanDriveStructure()
-    
     print("🔥 Allan Drive Structure Creator")
     print("=" * 50)
-    
-    # Показ структуры
-    creator.print_structure_tree()
-    
+
+    # Показ структуры (без создания экземпляра)
+    print_allan_structure()
+
     # Создание структуры (закомментировано для безопасности)
-    # creator.create_project_structure()
\ No newline at end of file
+    # create_allan_drive_structure()
\ No newline at end of file
@@ -4,11 +4,55 @@
 Быстрый запуск проекта Allan с минимальными настройками
 """
 
+import functools
+import importlib.util
+import json
 import os
+import shutil
 import subprocess
 import sys
 from pathlib import Path
 
+# Стадия записи на локальном диске: Drive FUSE дублирует каждый
+# записанный файл в локальный кэш и пишет на порядок медленнее
+# /content. Все создаем локально и заливаем на Drive одним rsync
+LOCAL_STAGE = "/content/allan_stage"
+DRIVE_ROOT = "/content/drive/MyDrive/ML_Projects/Allan_Model"
+
+# Кэш модуля google.colab: его импорт проходит по всему sys.path и
+# исполняет тяжелый __init__ пакета - достаточно одного раза
+_COLAB = None
+
+def _get_colab():
+    """Модуль google.colab (False, если мы не в Colab)"""
+    global _COLAB
+    if _COLAB is None:
+        try:
+            import google.colab as colab_module
+            _COLAB = colab_module
+        except ImportError:
+            _COLAB = False
+    return _COLAB
+
+class _Buf:
+    """Накопитель строк вывода фазы.
+
+    В Colab каждый print уходит отдельным RPC во фронтенд (~мс на
+    вызов); строки фазы копятся и пишутся одним кадром при flush().
+    """
+
+    def __init__(self):
+        self.lines = []
+
+    def log(self, line):
+        self.lines.append(line)
+
+    def flush(self):
+        if self.lines:
+            sys.stdout.write("\n".join(self.lines) + "\n")
+            sys.stdout.flush()
+            self.lines.clear()
+
 def print_header():
     """Печать заголовка"""
     print("=" * 60)
@@ -17,20 +61,18 @@ def print_header():
 
 def check_colab():
     """Проверка, что мы в Google Colab"""
-    try:
-        import google.colab
+    if _get_colab():
         print("✅ Google Colab обнаружен")
         return True
-    except ImportError:
-        print("❌ Этот скрипт предназначен для Google Colab")
-        return False
+    print("❌ Этот скрипт предназначен для Google Colab")
+    return False
 
 def mount_drive():
     """Подключение Google Drive"""
     print("\n🔗 Подключение Google Drive...")
     try:
-        from google.colab import drive
-        drive.mount('/content/drive')
+        colab = _get_colab()
+        colab.drive.mount('/content/drive')
         print("✅ Google Drive подключен")
         return True
     except Exception as e:
@@ -41,32 +83,82 @@ def install_dependencies():
     """Установка зависимостей"""
     print("\n📦 Установка зависимостей...")
     
+    # pathlib из списка убран: он в stdlib с Python 3.4, а бэкпорт
+    # с PyPI ломает окружение Colab
     packages = [
         "transformers",
-        "datasets", 
+        "datasets",
         "accelerate",
         "peft",
         "trl",
         "bitsandbytes",
-        "psutil",
-        "pathlib"
+        "psutil"
     ]
-    
-    for package in packages:
-        try:
-            print(f"  📥 Установка {package}...")
-            subprocess.run([
-                sys.executable, "-m", "pip", "install", "-q", package
-            ], check=True, capture_output=True)
-            print(f"  ✅ {package} установлен")
-        except subprocess.CalledProcessError as e:
-            print(f"  ⚠️  Ошибка установки {package}: {e}")
+
+    # Colab большинство из этого уже предустанавливает: ставим только
+    # то, чего реально нет, чтобы не раскручивать резолвер pip на
+    # огромном предустановленном наборе
+    need = [p for p in packages
+            if importlib.util.find_spec(p.replace("-", "_")) is None]
+    if not need:
+        print("  ✅ Все пакеты уже установлены")
+        return
+
+    # requirements-файл вместо аргументов CLI: pip идет по пакетному
+    # пути с одним графом резолвера, --no-input отключает любые
+    # интерактивные запросы
+    req_file = Path("/tmp/allan-req.txt")
+    req_file.write_text("\n".join(need) + "\n")
+
+    # Сначала pip прямо в текущем процессе: без fork/exec и старта
+    # еще одного интерпретатора (~сотни мс на Colab). API приватный,
+    # поэтому при любой проблеме откатываемся на subprocess
+    try:
+        from pip._internal.cli.main import main as pip_main
+        print(f"  📥 Установка {len(need)} пакетов (pip в текущем процессе)...")
+        if pip_main(["install", "-q", "--no-input", "--prefer-binary",
+                     "-r", str(req_file)]) == 0:
+            print("  ✅ Все пакеты установлены")
+            return
+        print("  ⚠️  pip вернул ошибку, пробуем через subprocess...")
+    except Exception:
+        pass
+
+    # Один вызов pip на весь список: резолвер отрабатывает один раз,
+    # колеса качаются параллельно; --prefer-binary исключает сборку
+    # из исходников
+    try:
+        print(f"  📥 Установка {len(need)} пакетов одним вызовом pip...")
+        subprocess.run([
+            sys.executable, "-m", "pip", "install", "-q", "--no-input",
+            "--prefer-binary", "-r", str(req_file)
+        ], check=True, stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL)
+        print("  ✅ Все пакеты установлены")
+    except subprocess.CalledProcessError:
+        # Пакетная установка не прошла - ставим по одному, чтобы
+        # увидеть, какой именно пакет сломался; итоги фазы уходят
+        # одним кадром
+        buf = _Buf()
+        for package in need:
+            try:
+                subprocess.run([
+                    sys.executable, "-m", "pip", "install", "-q",
+                    "--prefer-binary", package
+                ], check=True, stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL)
+                buf.log(f"  ✅ {package} установлен")
+            except subprocess.CalledProcessError as e:
+                buf.log(f"  ⚠️  Ошибка установки {package}: {e}")
+        buf.flush()
 
 def setup_project_structure():
     """Создание структуры проекта"""
     print("\n📁 Создание структуры проекта...")
     
-    base_path = "/content/drive/MyDrive/ML_Projects/Allan_Model"
+    # Структуру строим в локальной стадии - на Drive она попадет
+    # одним rsync в sync_to_drive()
+    base_path = LOCAL_STAGE
     directories = [
         f"{base_path}/datasets/raw",
         f"{base_path}/datasets/processed", 
@@ -78,12 +170,55 @@ def setup_project_structure():
         f"{base_path}/configs"
     ]
     
+    # Каждый os.makedirs заново stat'ит все родительские компоненты -
+    # на Drive FUSE это отдельный round-trip на каждый. Собираем
+    # уникальные компоненты и создаем каждый ровно один раз,
+    # от корня к листьям
+    all_dirs = set()
     for directory in directories:
+        path = directory
+        while path and path != "/" and path not in all_dirs:
+            all_dirs.add(path)
+            path = os.path.dirname(path)
+
+    buf = _Buf()
+    for directory in sorted(all_dirs, key=lambda p: p.count("/")):
         try:
-            os.makedirs(directory, exist_ok=True)
-            print(f"  📂 Создана папка: {directory}")
+            os.mkdir(directory)
+            buf.log(f"  📂 Создана папка: {directory}")
+        except FileExistsError:
+            pass
         except Exception as e:
-            print(f"  ⚠️  Ошибка создания {directory}: {e}")
+            buf.log(f"  ⚠️  Ошибка создания {directory}: {e}")
+    buf.flush()
+
+def sync_to_drive():
+    """Пакетная заливка локальной стадии на Google Drive"""
+    print("\n☁️  Синхронизация с Google Drive...")
+    try:
+        os.makedirs(DRIVE_ROOT, exist_ok=True)
+        # rsync стримит дерево одним процессом вместо N мелких записей,
+        # каждая из которых стоит round-trip метаданных на FUSE
+        subprocess.run(
+            ["rsync", "-a", "--inplace", LOCAL_STAGE + "/", DRIVE_ROOT + "/"],
+            check=True)
+        print(f"  ✅ Проект загружен на Drive: {DRIVE_ROOT}")
+    except Exception as e:
+        print(f"  ⚠️  Ошибка синхронизации с Drive: {e}")
+        return False
+
+    # Сброс кэша DriveFS: unmount дожидается фактической выгрузки и
+    # не дает локальному кэшу разрастаться
+    try:
+        colab = _get_colab()
+        if colab:
+            colab.drive.flush_and_unmount()
+            colab.drive.mount('/content/drive')
+            print("  ✅ Кэш DriveFS сброшен")
+    except Exception as e:
+        print(f"  ⚠️  Не удалось сбросить кэш DriveFS: {e}")
+
+    return True
 
 def download_allan_files():
     """Загрузка файлов Allan"""
@@ -102,36 +237,46 @@ def download_allan_files():
         "allan_performance_optimizer.py"
     ]
     
-    # Копируем файлы из текущей директории
+    # Копируем файлы из текущей директории; один readdir вместо
+    # stat'а на каждый кандидат (на Drive-маунте stat особенно дорог)
     current_dir = Path.cwd()
+    present = {entry.name for entry in os.scandir(current_dir)}
+    buf = _Buf()
     for file_name in files_to_copy:
         source = current_dir / file_name
-        if source.exists():
+        if file_name in present:
             try:
-                import shutil
-                shutil.copy2(source, f"{allan_path}/{file_name}")
-                print(f"  📄 Скопирован: {file_name}")
+                # copyfile идет через sendfile без copystat: исходные
+                # mtime/права для .py-файлов здесь не нужны, а это
+                # минус три syscall'а на файл
+                shutil.copyfile(str(source), f"{allan_path}/{file_name}")
+                buf.log(f"  📄 Скопирован: {file_name}")
             except Exception as e:
-                print(f"  ⚠️  Ошибка копирования {file_name}: {e}")
+                buf.log(f"  ⚠️  Ошибка копирования {file_name}: {e}")
         else:
-            print(f"  ⚠️  Файл не найден: {file_name}")
-    
+            buf.log(f"  ⚠️  Файл не найден: {file_name}")
+    buf.flush()
+
     return allan_path
 
 def setup_python_path(allan_path):
-    """Настройка Python path"""
+    """Настройка импорта модулей Allan"""
     print(f"\n🐍 Настройка Python path...")
-    
-    if allan_path not in sys.path:
-        sys.path.append(allan_path)
-        print(f"  ✅ {allan_path} добавлен в Python path")
-    
-    # Проверяем импорт
+
+    # Грузим модуль напрямую по пути файла: один open + компиляция.
+    # sys.path.append заставил бы каждый последующий импорт в сессии
+    # stat'ить еще и этот каталог
+    module_path = f"{allan_path}/allan_dataset_manager.py"
     try:
-        from allan_dataset_manager import AllanDatasetManager
+        spec = importlib.util.spec_from_file_location(
+            "allan_dataset_manager", module_path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["allan_dataset_manager"] = module
+        spec.loader.exec_module(module)
         print("  ✅ Allan Dataset Manager успешно импортирован")
         return True
-    except ImportError as e:
+    except Exception as e:
+        sys.modules.pop("allan_dataset_manager", None)
         print(f"  ❌ Ошибка импорта: {e}")
         return False
 
@@ -160,126 +305,120 @@ def test_dataset_manager():
         print(f"  ❌ Ошибка тестирования: {e}")
         return False
 
-def create_startup_notebook():
+def _code_cell(source):
+    """Код-ячейка ноутбука из списка строк"""
+    return {
+        "cell_type": "code",
+        "execution_count": None,
+        "metadata": {},
+        "outputs": [],
+        "source": source,
+    }
+
+# Стартовый ноутбук как обычный словарь: без гигантского строкового
+# литерала с ручным экранированием, сериализация через json.dump.
+# Путь к модулям и демонстрационный датасет - параметры шаблона
+@functools.lru_cache(maxsize=None)
+def build_notebook(allan_path: str = "/content/allan_temp",
+                   dataset: str = "sberquad") -> bytes:
+    """Сборка стартового ноутбука под конкретный путь и датасет.
+
+    Результат сериализуется и кодируется один раз на уникальную пару
+    аргументов; повторная генерация с теми же параметрами отдает
+    готовые байты из кэша.
+    """
+    nb = {
+        "cells": [
+            {
+                "cell_type": "markdown",
+                "metadata": {},
+                "source": [
+                    "# 🚀 Allan - Быстрый старт в Google Colab\n",
+                    "\n",
+                    "Этот ноутбук создан автоматически для быстрого запуска Allan.\n",
+                    "\n",
+                    "## 📋 Что делать дальше:\n",
+                    "1. Запустите все ячейки по порядку\n",
+                    "2. Выберите нужный ноутбук для обучения\n",
+                    "3. Настройте параметры под свои задачи\n",
+                    "4. Запустите обучение!\n",
+                    "\n",
+                    "## 📚 Полезные файлы:\n",
+                    "- `allan_train_colab.ipynb` - базовое обучение GPT-2\n",
+                    "- `colab_ru_qlora_gguf.ipynb` - продвинутое обучение с QLoRA\n",
+                    "- `allan_dataset_manager.py` - управление датасетами",
+                ],
+            },
+            _code_cell([
+                "# 🔗 Подключение Google Drive\n",
+                "from google.colab import drive\n",
+                "drive.mount('/content/drive')",
+            ]),
+            _code_cell([
+                "# 📦 Установка зависимостей\n",
+                "!pip install -q transformers datasets accelerate peft trl bitsandbytes psutil",
+            ]),
+            _code_cell([
+                "# 🚀 Импорт Allan\n",
+                "import sys\n",
+                f"sys.path.append('{allan_path}')\n",
+                "\n",
+                "from allan_dataset_manager import AllanDatasetManager, quick_load_dataset, list_datasets\n",
+                "print('✅ Allan успешно импортирован!')",
+            ]),
+            _code_cell([
+                "# 📊 Просмотр доступных датасетов\n",
+                "list_datasets()",
+            ]),
+            _code_cell([
+                "# 🔍 Проверка ресурсов\n",
+                "manager = AllanDatasetManager()\n",
+                "manager.monitor_resources()",
+            ]),
+            _code_cell([
+                "# 🎯 Быстрая загрузка датасета (пример)\n",
+                f"# dataset = quick_load_dataset('{dataset}')\n",
+                "# print(f'Датасет загружен: {len(dataset)} примеров')",
+            ]),
+        ],
+        "metadata": {
+            "kernelspec": {
+                "display_name": "Python 3",
+                "language": "python",
+                "name": "python3",
+            },
+            "language_info": {
+                "codemirror_mode": {
+                    "name": "ipython",
+                    "version": 3,
+                },
+                "file_extension": ".py",
+                "mimetype": "text/x-python",
+                "name": "python",
+                "nbconvert_exporter": "python",
+                "pygments_lexer": "ipython3",
+                "version": "3.8.0",
+            },
+        },
+        "nbformat": 4,
+        "nbformat_minor": 4,
+    }
+    return json.dumps(nb, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def create_startup_notebook(allan_path="/content/allan_temp", dataset="sberquad"):
     """Создание стартового ноутбука"""
     print("\n📓 Создание стартового ноутбука...")
-    
-    notebook_content = '''{
- "cells": [
-  {
-   "cell_type": "markdown",
-   "metadata": {},
-   "source": [
-    "# 🚀 Allan - Быстрый старт в Google Colab\\n",
-    "\\n",
-    "Этот ноутбук создан автоматически для быстрого запуска Allan.\\n",
-    "\\n",
-    "## 📋 Что делать дальше:\\n",
-    "1. Запустите все ячейки по порядку\\n",
-    "2. Выберите нужный ноутбук для обучения\\n",
-    "3. Настройте параметры под свои задачи\\n",
-    "4. Запустите обучение!\\n",
-    "\\n",
-    "## 📚 Полезные файлы:\\n",
-    "- `allan_train_colab.ipynb` - базовое обучение GPT-2\\n",
-    "- `colab_ru_qlora_gguf.ipynb` - продвинутое обучение с QLoRA\\n",
-    "- `allan_dataset_manager.py` - управление датасетами"
-   ]
-  },
-  {
-   "cell_type": "code",
-   "execution_count": null,
-   "metadata": {},
-   "outputs": [],
-   "source": [
-    "# 🔗 Подключение Google Drive\\n",
-    "from google.colab import drive\\n",
-    "drive.mount('/content/drive')"
-   ]
-  },
-  {
-   "cell_type": "code",
-   "execution_count": null,
-   "metadata": {},
-   "outputs": [],
-   "source": [
-    "# 📦 Установка зависимостей\\n",
-    "!pip install -q transformers datasets accelerate peft trl bitsandbytes psutil"
-   ]
-  },
-  {
-   "cell_type": "code",
-   "execution_count": null,
-   "metadata": {},
-   "outputs": [],
-   "source": [
-    "# 🚀 Импорт Allan\\n",
-    "import sys\\n",
-    "sys.path.append('/content/allan_temp')\\n",
-    "\\n",
-    "from allan_dataset_manager import AllanDatasetManager, quick_load_dataset, list_datasets\\n",
-    "print('✅ Allan успешно импортирован!')"
-   ]
-  },
-  {
-   "cell_type": "code",
-   "execution_count": null,
-   "metadata": {},
-   "outputs": [],
-   "source": [
-    "# 📊 Просмотр доступных датасетов\\n",
-    "list_datasets()"
-   ]
-  },
-  {
-   "cell_type": "code",
-   "execution_count": null,
-   "metadata": {},
-   "outputs": [],
-   "source": [
-    "# 🔍 Проверка ресурсов\\n",
-    "manager = AllanDatasetManager()\\n",
-    "manager.monitor_resources()"
-   ]
-  },
-  {
-   "cell_type": "code",
-   "execution_count": null,
-   "metadata": {},
-   "outputs": [],
-   "source": [
-    "# 🎯 Быстрая загрузка датасета (пример)\\n",
-    "# dataset = quick_load_dataset('sberquad')\\n",
-    "# print(f'Датасет загружен: {len(dataset)} примеров')"
-   ]
-  }
- ],
- "metadata": {
-  "kernelspec": {
-   "display_name": "Python 3",
-   "language": "python",
-   "name": "python3"
-  },
-  "language_info": {
-   "codemirror_mode": {
-    "name": "ipython",
-    "version": 3
-   },
-   "file_extension": ".py",
-   "mimetype": "text/x-python",
-   "name": "python",
-   "nbconvert_exporter": "python",
-   "pygments_lexer": "ipython3",
-   "version": "3.8.0"
-  }
- },
- "nbformat": 4,
- "nbformat_minor": 4
-}'''
-    
+
     try:
-        with open("/content/allan_quick_start.ipynb", "w", encoding="utf-8") as f:
-            f.write(notebook_content)
+        # Запись - один os.write готовых байтов, без TextIOWrapper
+        # и кодека на каждый вызов
+        payload = build_notebook(allan_path, dataset)
+        fd = os.open("/content/allan_quick_start.ipynb",
+                     os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, payload)
+        finally:
+            os.close(fd)
         print("  ✅ Создан ноутбук: allan_quick_start.ipynb")
         return True
     except Exception as e:
@@ -339,8 +478,11 @@ def main():
         return
     
     # Создание стартового ноутбука
-    create_startup_notebook()
-    
+    create_startup_notebook(allan_path)
+
+    # Заливка стадии на Drive одной пакетной операцией
+    sync_to_drive()
+
     # Следующие шаги
     print_next_steps()
 
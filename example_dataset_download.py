@@ -4,8 +4,53 @@
 Демонстрация загрузки и предобработки датасетов
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 from allan_dataset_downloader import AllanDatasetDownloader, quick_download_dataset
 
+# Локальный кэш примеров: маркер .ok рядом с датасетом означает, что
+# загрузка уже прошла и повторный запуск демо не ходит в сеть
+CACHE_ROOT = "/content/allan_cache"
+
+def _cache_marker(dataset_name):
+    return os.path.join(CACHE_ROOT, dataset_name, ".ok")
+
+def is_cached(dataset_name):
+    """Проверка, что датасет уже загружен в локальный кэш"""
+    return os.path.exists(_cache_marker(dataset_name))
+
+def mark_cached(dataset_name):
+    """Отметка успешной загрузки датасета"""
+    marker = _cache_marker(dataset_name)
+    os.makedirs(os.path.dirname(marker), exist_ok=True)
+    with open(marker, "w") as f:
+        f.write("")
+
+def download_cached(downloader, dataset_name, **kwargs):
+    """Загрузка датасета со skip'ом, если он уже в кэше"""
+    if is_cached(dataset_name):
+        print(f"⚡ Датасет '{dataset_name}' уже в локальном кэше - пропускаем загрузку")
+        return True
+    success = downloader.download_and_preprocess(dataset_name, **kwargs)
+    if success:
+        mark_cached(dataset_name)
+    return success
+
+def prefetch_dataset(executor, dataset_name):
+    """Фоновая загрузка сырых данных следующего датасета.
+
+    Пока текущий датасет предобрабатывается (CPU), сеть не простаивает:
+    сырые данные следующего примера качаются в отдельном потоке.
+    """
+    def _job():
+        if is_cached(dataset_name):
+            return True
+        return AllanDatasetDownloader().download_and_preprocess(
+            dataset_name, skip_preprocessing=True)
+
+    return executor.submit(_job)
+
 def main():
     """Основная функция демонстрации"""
     print("🚀 Allan Dataset Downloader - Пример использования")
@@ -30,8 +75,12 @@ def main():
     # Пример 1: Загрузка небольшого датасета с предобработкой
     print("\n" + "="*60)
     print("📥 Пример 1: Загрузка датасета 'rucola' с предобработкой")
-    
-    success = downloader.download_and_preprocess("rucola")
+
+    # Пока rucola обрабатывается, следующий датасет качается в фоне
+    executor = ThreadPoolExecutor(max_workers=1)
+    prefetch = prefetch_dataset(executor, "russian_paraphrase")
+
+    success = download_cached(downloader, "rucola")
     if success:
         print("✅ Датасет 'rucola' успешно загружен и обработан!")
         
@@ -47,8 +96,11 @@ def main():
     # Пример 2: Загрузка только сырых данных без предобработки
     print("\n" + "="*60)
     print("📥 Пример 2: Загрузка только сырых данных 'russian_paraphrase'")
-    
-    success = downloader.download_and_preprocess("russian_paraphrase", skip_preprocessing=True)
+
+    # Данные уже качались в фоне во время примера 1
+    success = prefetch.result()
+    if success:
+        mark_cached("russian_paraphrase")
     if success:
         print("✅ Сырые данные 'russian_paraphrase' загружены!")
         
@@ -67,11 +119,19 @@ def main():
     
     # Быстрая загрузка
     print("🚀 Быстрая загрузка датасета 'sberquad'...")
-    success = quick_download_dataset("sberquad")
+    if is_cached("sberquad"):
+        print("⚡ Датасет 'sberquad' уже в локальном кэше")
+        success = True
+    else:
+        success = quick_download_dataset("sberquad")
+        if success:
+            mark_cached("sberquad")
     if success:
         print("✅ Быстрая загрузка завершена!")
     else:
         print("❌ Быстрая загрузка не удалась")
+
+    executor.shutdown()
     
     # Показываем финальное использование диска
     print("\n💾 Финальное использование диска:")
@@ -4,10 +4,55 @@
 Быстрый запуск полной системы Allan с Google Drive в одной команде!
 """
 
+import functools
+import importlib.util
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+@functools.lru_cache(maxsize=1)
+def _datasets_table():
+    """Отпечаток таблицы датасетов.
+
+    Список датасетов за сессию не меняется - перечисление и
+    форматирование делаем один раз, повторные показы отдают готовую
+    строку без нового обхода.
+    """
+    import contextlib
+    import io
+    from allan_dataset_manager import list_datasets
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        list_datasets()
+    return buffer.getvalue()
+
+def show_datasets():
+    """Печать таблицы доступных датасетов (из кэша)"""
+    sys.stdout.write(_datasets_table())
+
+def refresh_datasets():
+    """Сброс кэша таблицы датасетов (после добавления новых)"""
+    _datasets_table.cache_clear()
+
+@functools.lru_cache(maxsize=1)
+def _gpu_info():
+    """Доступность CUDA и имя GPU.
+
+    torch.cuda.is_available() инициализирует драйвер CUDA (до секунды
+    на холодном старте) - кэшируем, чтобы диагностика и настройка не
+    платили за это дважды. find_spec не дает упасть без torch.
+    """
+    if importlib.util.find_spec("torch") is None:
+        return False, None
+    try:
+        import torch
+        if torch.cuda.is_available():
+            return True, torch.cuda.get_device_name(0)
+    except Exception:
+        pass
+    return False, None
+
 def print_banner():
     """Красивый баннер Allan"""
     banner = """
@@ -36,11 +81,10 @@ def download_allan_tools():
         "allan_drive_structure.py"
     ]
     
-    # Проверяем наличие файлов локально
-    missing_tools = []
-    for tool in tools:
-        if not os.path.exists(tool):
-            missing_tools.append(tool)
+    # Проверяем наличие файлов локально: один readdir вместо
+    # stat'а на каждый инструмент
+    present = {entry.name for entry in os.scandir('.')}
+    missing_tools = [tool for tool in tools if tool not in present]
     
     if missing_tools:
         print("⚠️  Некоторые инструменты не найдены локально:")
@@ -91,9 +135,9 @@ def quick_setup_allan():
         print("\n⚡ Оптимизация системы для обучения...")
         optimize_allan_for_training()
         
-        # Шаг 6: Показ доступных датасетов
+        # Шаг 6: Показ доступных датасетов (таблица кэшируется)
         print("\n📚 Доступные датасеты для Allan:")
-        list_datasets()
+        show_datasets()
         
         # Шаг 7: Финальная информация
         print_success_info()
@@ -194,37 +238,45 @@ def diagnose_system():
     # Проверка Python версии
     print(f"🐍 Python: {sys.version}")
     
-    # Проверка подключения к Drive
-    drive_connected = os.path.exists('/content/drive/MyDrive')
+    # Проверка подключения к Drive: ismount читает таблицу маунтов из
+    # памяти ядра, а exists() на Drive-пути может повиснуть на FUSE
+    drive_connected = os.path.ismount('/content/drive')
     drive_icon = "✅" if drive_connected else "❌"
     print(f"{drive_icon} Google Drive: {'Подключен' if drive_connected else 'Не подключен'}")
     
-    # Проверка инструментов Allan
+    # Проверка инструментов Allan: один readdir на все файлы
     tools = ["allan_colab_setup.py", "allan_dataset_manager.py", "allan_performance_optimizer.py"]
+    present = {entry.name for entry in os.scandir('.')}
     for tool in tools:
-        exists = os.path.exists(tool)
+        exists = tool in present
         icon = "✅" if exists else "❌"
         print(f"{icon} {tool}: {'Доступен' if exists else 'Отсутствует'}")
     
-    # Проверка библиотек
+    # Проверка библиотек и GPU параллельно: импорты ждут диска, CUDA -
+    # инициализации драйвера, GIL на этом отпускается. Время - самая
+    # медленная проверка вместо суммы всех; печать в прежнем порядке
     libraries = ["torch", "transformers", "datasets", "psutil"]
-    for lib in libraries:
+
+    def _try_import(lib):
         try:
             __import__(lib)
-            print(f"✅ {lib}: Установлен")
+            return True
         except ImportError:
-            print(f"❌ {lib}: Не установлен")
-    
-    # Проверка GPU
-    try:
-        import torch
-        if torch.cuda.is_available():
-            gpu_name = torch.cuda.get_device_name(0)
-            print(f"✅ GPU: {gpu_name}")
-        else:
-            print("❌ GPU: Недоступен")
-    except:
-        print("❌ GPU: Ошибка проверки")
+            return False
+
+    with ThreadPoolExecutor(max_workers=len(libraries) + 1) as executor:
+        lib_futures = {lib: executor.submit(_try_import, lib) for lib in libraries}
+        gpu_future = executor.submit(_gpu_info)
+        for lib in libraries:
+            if lib_futures[lib].result():
+                print(f"✅ {lib}: Установлен")
+            else:
+                print(f"❌ {lib}: Не установлен")
+        gpu_available, gpu_name = gpu_future.result()
+    if gpu_available:
+        print(f"✅ GPU: {gpu_name}")
+    else:
+        print("❌ GPU: Недоступен")
 
 def interactive_setup():
     """Интерактивная настройка Allan"""
@@ -275,9 +327,11 @@ def interactive_setup():
 # Главные функции для экспорта
 __all__ = [
     'quick_setup_allan',
-    'diagnose_system', 
+    'diagnose_system',
     'interactive_setup',
-    'show_quick_commands'
+    'show_quick_commands',
+    'show_datasets',
+    'refresh_datasets'
 ]
 
 if __name__ == "__main__":
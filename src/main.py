@@ -1,7 +1,10 @@
 # src/main.py
 
+import argparse
 import logging
-from src.core import Allan
+import time
+
+__version__ = "0.1.0"
 
 def setup_logging():
     logging.basicConfig(
@@ -9,13 +12,42 @@ def setup_logging():
         format="%(asctime)s [%(levelname)s] %(message)s"
     )
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="allan", description="Запуск ядра Allan")
+    parser.add_argument(
+        "--version", action="version", version=f"Allan {__version__}")
+    parser.add_argument(
+        "--check", action="store_true",
+        help="проверить окружение и выйти, не загружая ядро")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    # Разбор аргументов до любой тяжелой работы: --version/--help
+    # выходят мгновенно, не загружая ядро и его зависимости
+    args = parse_args(argv)
+
     setup_logging()
+
+    if args.check:
+        logging.info("✅ Окружение в порядке, ядро не загружалось.")
+        return
+
     logging.info("🚀 Allan запускается...")
 
+    # Ядро импортируем только здесь: оно тянет тяжелые зависимости,
+    # и ранний выход не должен их грузить
+    logging.info("Загрузка ядра Allan...")
+    start = time.perf_counter()
+    from src.core import Allan
+    logging.info("Ядро загружено за %.2f с", time.perf_counter() - start)
+
     # Инициализация ядра
-    bot = Allan()
-    bot.run()
+    try:
+        bot = Allan()
+        bot.run()
+    except KeyboardInterrupt:
+        logging.info("⏹️  Allan остановлен пользователем")
 
 if __name__ == "__main__":
     main()